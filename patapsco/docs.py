@@ -5,6 +5,7 @@ import gzip
 import json
 import logging
 import pathlib
+import shutil
 from typing import Optional
 
 from .error import ParseError
@@ -170,6 +171,7 @@ class DocWriter(Task):
         super().__init__(run_path, artifact_config, config.output)
         path = self.base / 'documents.jsonl'
         self.file = open(path, 'w')
+        self.encoder = DataclassJSONEncoder(ensure_ascii=False)
 
     def process(self, doc):
         """
@@ -179,11 +181,25 @@ class DocWriter(Task):
         Returns:
             Doc
         """
+        self.file.write(self._serialize(doc))
+        return doc
+
+    def batch_process(self, docs):
+        """
+        Args:
+            docs (list): List of Doc objects
+
+        Returns:
+            list of Doc objects
+        """
+        self.file.write(''.join([self._serialize(doc) for doc in docs]))
+        return docs
+
+    def _serialize(self, doc):
         # if no database, we remove the extra text object before serializing
         if hasattr(doc, 'original_text'):
             del doc.original_text
-        self.file.write(json.dumps(doc, ensure_ascii=False, cls=DataclassJSONEncoder) + "\n")
-        return doc
+        return self.encoder.encode(doc) + "\n"
 
     def end(self):
         super().end()
@@ -193,8 +209,7 @@ class DocWriter(Task):
         for base in dirs:
             path = path_append(base, 'documents.jsonl')
             with open(path) as fp:
-                for line in fp:
-                    self.file.write(line)
+                shutil.copyfileobj(fp, self.file)
 
 
 class DocReader(InputIterator):
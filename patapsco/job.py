@@ -6,6 +6,7 @@ import json
 import logging
 import math
 import multiprocessing
+import os
 import pathlib
 import sys
 import subprocess
@@ -18,10 +19,10 @@ from .docs import DocumentProcessor, DocumentReaderFactory, DocReader, DocWriter
 from .error import ConfigError, PatapscoError
 from .helpers import ArtifactHelper
 from .index import IndexerFactory
-from .pipeline import BatchPipeline, StreamingPipeline
+from .pipeline import BatchPipeline, ParallelStreamingPipeline, StreamingPipeline, ThreadedPipeline
 from .rerank import RerankFactory
 from .results import JsonResultsWriter, JsonResultsReader, TrecResultsWriter
-from .retrieve import RetrieverFactory
+from .retrieve import PyseriniRetriever, RetrieverFactory
 from .schema import RunnerConfig, PipelineMode, Tasks
 from .score import Scorer
 from .topics import TopicProcessor, TopicReaderFactory, QueryProcessor, QueryReader, QueryWriter
@@ -274,6 +275,7 @@ class MultiprocessingJob(Job):
             conf.run.parallel = None
             conf.run.stage1 = False
             self._update_stage2_output_paths(conf, sub_directory)
+            self._update_stage2_threads(conf, len(indices))
             stage2_jobs.append(MultiprocessingJobDef(part, conf))
         return stage2_jobs
 
@@ -307,6 +309,13 @@ class MultiprocessingJob(Job):
             if conf.rerank.output:
                 conf.rerank.output = path_append(part, conf.rerank.output)
 
+    @staticmethod
+    def _update_stage2_threads(conf, num_jobs):
+        # the jobs share this machine so split the processors between their retrievers
+        with ignore_exception(AttributeError):
+            if not conf.retrieve.threads:
+                conf.retrieve.threads = max(1, os.cpu_count() // num_jobs)
+
     def _del_reduce_directories(self):
         base_dir = pathlib.Path(self.run_path)
         [delete_dir(item) for item in base_dir.glob('part*')]
@@ -556,6 +565,9 @@ class JobBuilder:
     Handles restarting a run where it left off.
     Will create pipelines for partial runs (that end early or start from artifacts).
     """
+
+    DEFAULT_RETRIEVAL_BATCH_SIZE = 1000
+
     def __init__(self, conf, job_type=JobType.NORMAL, **kwargs):
         """
         Args:
@@ -739,9 +751,16 @@ class JobBuilder:
             batch_size_char = str(stage_conf.batch_size) if stage_conf.batch_size else '∞'
             LOGGER.info("Stage 1 is a batch pipeline selected with batch size of %s.", batch_size_char)
             pipeline_class = functools.partial(BatchPipeline, n=stage_conf.batch_size)
+        elif stage_conf.mode == PipelineMode.PARALLEL:
+            # none of the stage 1 tasks are thread safe and the indexer needs the documents in order
+            raise ConfigError("Parallel pipeline mode is only supported for stage 2")
+        elif stage_conf.mode == PipelineMode.THREADED:
+            LOGGER.info("Stage 1 is a threaded pipeline with a thread per task.")
+            pipeline_class = ThreadedPipeline
         else:
             raise ConfigError(f"Unrecognized pipeline mode: {stage_conf.mode}")
-        pipeline = pipeline_class(iterator, tasks, progress_interval=stage_conf.progress_interval)
+        pipeline = pipeline_class(iterator, tasks, progress_interval=stage_conf.progress_interval,
+                                  timed=stage_conf.timing)
         LOGGER.info("Stage 1 pipeline: %s", pipeline)
         return pipeline
 
@@ -853,6 +872,12 @@ class JobBuilder:
         if self.conf.run.parallel:
             LOGGER.info(f'Stage 2 has {stage_conf.num_jobs} parallel jobs.')
 
+        if 'mode' not in stage_conf.__fields_set__ and any(isinstance(task, PyseriniRetriever) for task in tasks):
+            # lucene searches a batch of queries with multiple threads so batch is the default for retrieval
+            stage_conf.mode = PipelineMode.BATCH.value
+            if not stage_conf.batch_size:
+                stage_conf.batch_size = self.DEFAULT_RETRIEVAL_BATCH_SIZE
+
         if stage_conf.mode == PipelineMode.STREAMING:
             LOGGER.info("Stage 2 is a streaming pipeline.")
             pipeline_class = StreamingPipeline
@@ -860,9 +885,17 @@ class JobBuilder:
             batch_size_char = str(stage_conf.batch_size) if stage_conf.batch_size else '∞'
             LOGGER.info("Stage 2 is a batch pipeline selected with batch size of %s.", batch_size_char)
             pipeline_class = functools.partial(BatchPipeline, n=stage_conf.batch_size)
+        elif stage_conf.mode == PipelineMode.PARALLEL:
+            num_threads_char = str(stage_conf.num_threads) if stage_conf.num_threads else 'all processors'
+            LOGGER.info("Stage 2 is a parallel streaming pipeline using %s threads.", num_threads_char)
+            pipeline_class = functools.partial(ParallelStreamingPipeline, n=stage_conf.num_threads)
+        elif stage_conf.mode == PipelineMode.THREADED:
+            LOGGER.info("Stage 2 is a threaded pipeline with a thread per task.")
+            pipeline_class = ThreadedPipeline
         else:
             raise ConfigError(f"Unrecognized pipeline mode: {stage_conf.mode}")
-        pipeline = pipeline_class(iterator, tasks, progress_interval=stage_conf.progress_interval)
+        pipeline = pipeline_class(iterator, tasks, progress_interval=stage_conf.progress_interval,
+                                  timed=stage_conf.timing)
         LOGGER.info("Stage 2 pipeline: %s", pipeline)
         return pipeline
 
@@ -1,10 +1,17 @@
 import abc
+import collections
+import concurrent.futures
 import logging
+import os
 import pathlib
+import queue
+import threading
+import timeit
 
 from .config import ConfigService
-from .util import Timer, TimedIterator, ChunkedIterator
+from .util import Timer, TimedIterator, ChunkedIterator, close_iterator
 from .util.file import touch_complete
+from .util.java import detach_thread
 
 LOGGER = logging.getLogger(__name__)
 
@@ -15,8 +22,11 @@ class Task(abc.ABC):
     Implementations must define a process() method.
     Any initialization or cleanup can be done in begin() or end().
     See Pipeline for how to construct a pipeline of tasks.
+    Tasks that can safely process items from multiple threads at once should set thread_safe.
     """
 
+    thread_safe = False
+
     def __init__(self, run_path=None, artifact_config=None, base=None):
         """
         Args:
@@ -88,13 +98,26 @@ class TimedTask(Task):
         super().__init__()
         self.task = task
         self.timer = Timer()
+        self.lock = threading.Lock()
 
     def process(self, item):
-        with self.timer:
+        # the start time is kept local and the update is locked so that the timer can be shared across threads
+        start = timeit.default_timer()
+        try:
             return self.task.process(item)
+        finally:
+            self._add_time(timeit.default_timer() - start)
 
     def batch_process(self, items):
-        return self.task.batch_process(items)
+        start = timeit.default_timer()
+        try:
+            return self.task.batch_process(items)
+        finally:
+            self._add_time(timeit.default_timer() - start)
+
+    def _add_time(self, elapsed):
+        with self.lock:
+            self.timer.time += elapsed
 
     def begin(self):
         self.task.begin()
@@ -108,6 +131,10 @@ class TimedTask(Task):
     def run_reduce(self):
         self.task.run_reduce()
 
+    @property
+    def thread_safe(self):
+        return self.task.thread_safe
+
     @property
     def time(self):
         return self.timer.time
@@ -119,14 +146,21 @@ class TimedTask(Task):
 class Pipeline(abc.ABC):
     """Interface for a pipeline of tasks"""
 
-    def __init__(self, iterator, tasks, progress_interval=None):
+    def __init__(self, iterator, tasks, progress_interval=None, timed=True):
         """
         Args:
             iterator (iterator): Iterator over input for pipeline.
             tasks (list): List of tasks run in sequence.
+            progress_interval (int): How often to log progress.
+            timed (bool): Whether to time the iterator and tasks for the report.
         """
-        self.iterator = TimedIterator(iterator)
-        self.tasks = [TimedTask(task) for task in tasks]
+        self.timed = timed
+        if timed:
+            self.iterator = TimedIterator(iterator)
+            self.tasks = [TimedTask(task) for task in tasks]
+        else:
+            self.iterator = iterator
+            self.tasks = list(tasks)
         self.progress_interval = progress_interval
         self.count = 0
 
@@ -140,6 +174,7 @@ class Pipeline(abc.ABC):
             task.begin()
 
     def end(self):
+        close_iterator(self.iterator)
         for task in self.tasks:
             task.end()
 
@@ -149,6 +184,8 @@ class Pipeline(abc.ABC):
 
     @property
     def report(self):
+        if not self.timed:
+            return []
         report = [(str(self.iterator), self.iterator.time)]
         report.extend((str(task), task.time) for task in self.tasks)
         return report
@@ -164,9 +201,11 @@ class StreamingPipeline(Pipeline):
 
     def run(self):
         self.begin()
+        # bind the process methods once rather than looking them up for every item
+        process_methods = [task.process for task in self.tasks]
         for item in self.iterator:
-            for task in self.tasks:
-                item = task.process(item)
+            for process in process_methods:
+                item = process(item)
                 # tasks can reject an item by returning None (they should log a warning/error)
                 if not item:
                     break
@@ -180,14 +219,14 @@ class StreamingPipeline(Pipeline):
 class BatchPipeline(Pipeline):
     """Pipeline that pushes chunks of input through the tasks"""
 
-    def __init__(self, iterator, tasks, n, progress_interval=None):
+    def __init__(self, iterator, tasks, n, progress_interval=None, timed=True):
         """
         Args:
             iterator (iterator): Iterator that produces input for the pipeline.
             tasks (list): List of tasks.
             n (int): Batch size or None to process all.
         """
-        super().__init__(ChunkedIterator(iterator, n), tasks, progress_interval)
+        super().__init__(ChunkedIterator(iterator, n), tasks, progress_interval, timed)
         self.current_progress = self.progress_interval
 
     def run(self):
@@ -205,3 +244,167 @@ class BatchPipeline(Pipeline):
         if self.progress_interval and self.count >= self.current_progress:
             LOGGER.info(f"{self.count} iterations completed...")
             self.current_progress += self.progress_interval
+
+
+class ParallelStreamingPipeline(Pipeline):
+    """Pipeline that streams items through a group of thread safe tasks using a pool of threads
+
+    This is useful when a task spends its time outside of the GIL like Lucene retrieval.
+    The first contiguous group of thread safe tasks runs in the pool.
+    The tasks before the group run on the main thread before an item is submitted to the pool
+    and the tasks after the group run on the main thread in the order that the items were submitted.
+    The order of items is preserved and only a few items per thread are read ahead of the output.
+    """
+
+    def __init__(self, iterator, tasks, n=None, progress_interval=None, timed=True):
+        """
+        Args:
+            iterator (iterator): Iterator that produces input for the pipeline.
+            tasks (list): List of tasks.
+            n (int): Number of threads or None to use the number of processors.
+        """
+        super().__init__(iterator, tasks, progress_interval, timed)
+        self.n = n if n else os.cpu_count()
+        self.max_pending = 4 * self.n
+        start = 0
+        while start < len(self.tasks) and not self.tasks[start].thread_safe:
+            start += 1
+        stop = start
+        while stop < len(self.tasks) and self.tasks[stop].thread_safe:
+            stop += 1
+        self.pre_tasks = self.tasks[:start]
+        self.parallel_tasks = self.tasks[start:stop]
+        self.post_tasks = self.tasks[stop:]
+
+    def run(self):
+        self.begin()
+        work_queue = queue.Queue()
+        threads = [threading.Thread(target=self._run_worker, args=(work_queue,)) for _ in range(self.n)]
+        for thread in threads:
+            thread.start()
+        pending = collections.deque()
+        try:
+            for item in self.iterator:
+                item = self._run_tasks(self.pre_tasks, item)
+                if item is None:
+                    continue
+                future = concurrent.futures.Future()
+                work_queue.put((future, item))
+                pending.append(future)
+                if len(pending) >= self.max_pending:
+                    self._run_post(pending.popleft().result())
+            while pending:
+                self._run_post(pending.popleft().result())
+        finally:
+            # if a task failed, skip the items that the workers have not started
+            for future in pending:
+                future.cancel()
+            for _ in threads:
+                work_queue.put(None)
+            for thread in threads:
+                thread.join()
+        self.end()
+
+    def _run_worker(self, work_queue):
+        try:
+            while True:
+                work = work_queue.get()
+                if work is None:
+                    break
+                future, item = work
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._run_tasks(self.parallel_tasks, item))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            detach_thread()
+
+    def _run_post(self, item):
+        if item is not None:
+            item = self._run_tasks(self.post_tasks, item)
+        if item:
+            self.count += 1
+            if self.progress_interval and self.count % self.progress_interval == 0:
+                LOGGER.info(f"{self.count} iterations completed...")
+
+    @staticmethod
+    def _run_tasks(tasks, item):
+        for task in tasks:
+            item = task.process(item)
+            # tasks can reject an item by returning None (they should log a warning/error)
+            if not item:
+                return None
+        return item
+
+
+class ThreadedPipeline(Pipeline):
+    """Pipeline that runs each task in its own thread
+
+    Items are passed between tasks through bounded queues so that reading, processing and writing overlap.
+    This helps when tasks spend time outside of the GIL like file I/O and Lucene.
+    Each task only sees items from its own thread and the order of items is preserved.
+    """
+
+    QUEUE_SIZE = 1024
+    DONE = object()  # marks the end of the input in a queue
+
+    def run(self):
+        self.begin()
+        self.errors = []
+        self.failed = threading.Event()
+        queues = [queue.Queue(self.QUEUE_SIZE) for _ in self.tasks]
+        output_queues = queues[1:] + [None]
+        threads = [threading.Thread(target=self._run_task, args=(task, in_queue, out_queue), name=str(task))
+                   for task, in_queue, out_queue in zip(self.tasks, queues, output_queues)]
+        for thread in threads:
+            thread.start()
+        try:
+            for item in self.iterator:
+                if self.failed.is_set():
+                    break
+                queues[0].put(item)
+        finally:
+            queues[0].put(self.DONE)
+            for thread in threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
+        self.end()
+
+    def _run_task(self, task, in_queue, out_queue):
+        try:
+            self._process_queue(task, in_queue, out_queue)
+        finally:
+            detach_thread()
+
+    def _process_queue(self, task, in_queue, out_queue):
+        failed = False
+        while True:
+            item = in_queue.get()
+            if item is self.DONE:
+                break
+            if failed:
+                continue  # keep draining the queue so that the upstream threads do not block
+            try:
+                item = task.process(item)
+            except Exception as e:
+                self.errors.append(e)
+                self.failed.set()
+                failed = True
+                continue
+            # tasks can reject an item by returning None (they should log a warning/error)
+            if not item:
+                continue
+            if out_queue:
+                out_queue.put(item)
+            else:
+                self._update_count()
+        if out_queue:
+            out_queue.put(self.DONE)
+
+    def _update_count(self):
+        self.count += 1
+        if self.progress_interval and self.count % self.progress_interval == 0:
+            LOGGER.info(f"{self.count} iterations completed...")
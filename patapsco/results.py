@@ -4,11 +4,12 @@ import dataclasses
 import json
 import logging
 import pathlib
+import shutil
 from typing import List, Union
 
 from .pipeline import Task
 from .topics import Query
-from .util import DataclassJSONEncoder
+from .util import DATACLASS_ENCODER
 from .util.file import count_lines, path_append
 
 LOGGER = logging.getLogger(__name__)
@@ -17,6 +18,7 @@ LOGGER = logging.getLogger(__name__)
 @dataclasses.dataclass
 class Result:
     """Single result for a query"""
+    __slots__ = ('doc_id', 'rank', 'score')  # retrieval creates a result for every hit so keep them small
     doc_id: str
     rank: int
     score: Union[int, float]
@@ -60,8 +62,10 @@ class TrecResultsWriter(Task):
         Args:
             results (Results): Results for a query
         """
-        for result in results.results:
-            self.file.write(f"{results.query.id} Q0 {result.doc_id} {result.rank} {result.score} {results.system}\n")
+        query_id = results.query.id
+        system = results.system
+        self.file.write(''.join([f"{query_id} Q0 {result.doc_id} {result.rank} {result.score} {system}\n"
+                                 for result in results.results]))
         return results
 
     def end(self):
@@ -73,8 +77,7 @@ class TrecResultsWriter(Task):
         LOGGER.debug("Reducing to a single results file from %s", ', '.join(str(x) for x in dirs))
         for d in dirs:
             with open(d / self.filename) as fp:
-                for line in fp:
-                    self.file.write(line)
+                shutil.copyfileobj(fp, self.file)
 
 
 class TrecResultsReader:
@@ -127,9 +130,17 @@ class JsonResultsWriter(Task):
         Args:
             results (Results): Results for a query
         """
-        self.file.write(json.dumps(results, cls=DataclassJSONEncoder) + "\n")
+        self.file.write(DATACLASS_ENCODER.encode(results) + "\n")
         return results
 
+    def batch_process(self, batch):
+        """
+        Args:
+            batch (list): List of Results objects
+        """
+        self.file.write(''.join([DATACLASS_ENCODER.encode(results) + "\n" for results in batch]))
+        return batch
+
     def end(self):
         super().end()
         self.file.close()
@@ -138,8 +149,7 @@ class JsonResultsWriter(Task):
         for base in dirs:
             path = path_append(base, 'results.jsonl')
             with open(path) as fp:
-                for line in fp:
-                    self.file.write(line)
+                shutil.copyfileobj(fp, self.file)
 
 
 class JsonResultsReader:
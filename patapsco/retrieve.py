@@ -1,5 +1,7 @@
 import logging
+import os
 import pathlib
+import threading
 
 from .error import ConfigError, PatapscoError
 from .pipeline import Task
@@ -61,6 +63,7 @@ class PSQSearcher:
 class PyseriniRetriever(Task):
     """Use Lucene to retrieve documents from an index"""
 
+
     def __init__(self, run_path, config):
         """
         Args:
@@ -70,8 +73,10 @@ class PyseriniRetriever(Task):
         super().__init__(run_path)
         self.config = config
         self.number = self.config.number
+        self.threads = self.config.threads if self.config.threads else os.cpu_count()
         self.index_dir = pathlib.Path(run_path) / self.config.input.index.path
         self._searcher = None
+        self._searcher_lock = threading.Lock()
         self.java = Java()
         self.lang = None  # documents language
         self.log_explanations = config.log_explanations
@@ -82,37 +87,48 @@ class PyseriniRetriever(Task):
             self.parser = self.java.QueryParser('contents', self.java.WhitespaceAnalyzer())
         LOGGER.info(f"Index location: {self.index_dir}")
 
+    @property
+    def thread_safe(self):
+        # the lucene searcher is shared across threads but the classic query parser and psq searcher are not thread safe
+        return not (self.parse or self.config.psq)
+
     @property
     def searcher(self):
         if not self._searcher:
+            with self._searcher_lock:
+                if not self._searcher:
+                    self._searcher = self._create_searcher()
+        return self._searcher
+
+    def _create_searcher(self):
+        if self.config.psq:
+            searcher = PSQSearcher(str(self.index_dir))
+            LOGGER.info('Using PSQ')
+        else:
+            searcher = self.java.SimpleSearcher(str(self.index_dir))
+            searcher.set_analyzer(self.java.WhitespaceAnalyzer())
+        if self.config.name == "qld":
+            mu = self.config.mu
+            searcher.set_qld(mu)
+            LOGGER.info(f'Using QLD with parameter mu={mu}')
+        else:
+            k1 = self.config.k1
+            b = self.config.b
+            searcher.set_bm25(k1, b)
+            LOGGER.info(f'Using BM25 with parameters k1={k1} and b={b}')
+
+        if self.config.rm3:
             if self.config.psq:
-                self._searcher = PSQSearcher(str(self.index_dir))
-                LOGGER.info('Using PSQ')
-            else:
-                self._searcher = self.java.SimpleSearcher(str(self.index_dir))
-                self._searcher.set_analyzer(self.java.WhitespaceAnalyzer())
-            if self.config.name == "qld":
-                mu = self.config.mu
-                self._searcher.set_qld(mu)
-                LOGGER.info(f'Using QLD with parameter mu={mu}')
-            else:
-                k1 = self.config.k1
-                b = self.config.b
-                self._searcher.set_bm25(k1, b)
-                LOGGER.info(f'Using BM25 with parameters k1={k1} and b={b}')
-
-            if self.config.rm3:
-                if self.config.psq:
-                    raise ConfigError("Unsupported operation PSQ + RM3")
-
-                fb_terms = self.config.fb_terms
-                fb_docs = self.config.fb_docs
-                weight = self.config.original_query_weight
-                logging = self.config.rm3_logging
-                self._searcher.set_rm3(fb_terms, fb_docs, weight, logging, rm3_filter_terms=False)
-                LOGGER.info(f'Adding RM3: fb_terms={fb_terms}, fb_docs={fb_docs}, original_query_weight={weight}')
+                raise ConfigError("Unsupported operation PSQ + RM3")
 
-        return self._searcher
+            fb_terms = self.config.fb_terms
+            fb_docs = self.config.fb_docs
+            weight = self.config.original_query_weight
+            logging = self.config.rm3_logging
+            searcher.set_rm3(fb_terms, fb_docs, weight, logging, rm3_filter_terms=False)
+            LOGGER.info(f'Adding RM3: fb_terms={fb_terms}, fb_docs={fb_docs}, original_query_weight={weight}')
+
+        return searcher
 
     def begin(self):
         try:
@@ -150,6 +166,40 @@ class PyseriniRetriever(Task):
             LOGGER.info(f"Lucene failed to return results for f{query.id} with error {e}")
             return Results(query, self.lang, str(self), [])
 
+    def batch_process(self, queries):
+        """Retrieve ranked lists of documents for a batch of queries
+
+        Lucene searches the batch with multiple threads.
+        PSQ and parsed queries are not supported by the batch search so they are retrieved one at a time.
+
+        Args:
+            queries (list of Query)
+
+        Returns:
+            list of Results
+        """
+        qids = [query.id for query in queries]
+        if self.config.psq or self.parse or len(set(qids)) != len(qids):
+            return super().batch_process(queries)
+
+        try:
+            texts = [query.query for query in queries]
+            hits_dict = self.searcher.batch_search(texts, qids, k=self.number, threads=self.threads)
+        except self.java.JavaException as e:
+            # fall back to searching one query at a time to isolate the query that lucene choked on
+            LOGGER.debug(f"Lucene batch search failed with error {e}")
+            return super().batch_process(queries)
+
+        batch_results = []
+        for query in queries:
+            hits = hits_dict.get(query.id, [])
+            LOGGER.debug(f"Retrieved {len(hits)} documents for {query.id}: {query.query}")
+            if self.log_explanations:
+                self._log_explanation(query.query, hits)
+            results = [Result(hit.docid, rank, hit.score) for rank, hit in enumerate(hits)]
+            batch_results.append(Results(query, self.lang, str(self), results))
+        return batch_results
+
     def end(self):
         if self._searcher:
             self._searcher.close()
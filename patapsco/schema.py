@@ -6,6 +6,8 @@ from .config import BaseConfig, SectionConfig, UncheckedSectionConfig, Optional,
 class PipelineMode(str, enum.Enum):
     STREAMING = 'streaming'
     BATCH = 'batch'
+    PARALLEL = 'parallel'
+    THREADED = 'threaded'
 
 
 class Tasks(str, enum.Enum):
@@ -157,6 +159,7 @@ class RetrieveConfig(SectionConfig):
     """Configuration for retrieval"""
     name: str  # bm25 or qld
     number: int = 1000
+    threads: Optional[int]  # threads for searching a batch of queries, the default is the number of processors
     input: Optional[RetrieveInputConfig]
     output: Union[bool, str] = True
     log_explanations: bool = False
@@ -223,10 +226,12 @@ class ScoreConfig(SectionConfig):
 
 class StageConfig(BaseConfig):
     """Configuration for one of the stages"""
-    mode: str = "streaming"  # streaming or batch
+    mode: str = "streaming"  # streaming, batch, parallel, or threaded
     batch_size: Optional[int]  # for batch, the default is a single batch
+    num_threads: Optional[int]  # for parallel, the default is the number of processors
     num_jobs: int = 1  # number of parallel jobs
     progress_interval: Optional[int]  # how often should progress be logged
+    timing: bool = True  # time the tasks for the report, disable to remove the per item overhead
     # start and stop are intended for parallel processing
     start: Optional[int]  # O-based index of start position in input (inclusive)
     stop: Optional[int]  # O-based index of stop position in input (exclusive)
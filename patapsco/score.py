@@ -1,7 +1,8 @@
-import collections
 import logging
 import sys
 
+import numpy as np
+
 try:
     import pytrec_eval
 except ImportError:
@@ -38,7 +39,7 @@ class TrecQrelsReader:
         """
         data = {}
         for qrels in self.qrels_iter:
-            data = {**data, **qrels}
+            data.update(qrels)
         return data
 
 
@@ -74,6 +75,12 @@ class Scorer:
         self.metrics = self._preprocess_metrics(metrics)
         self.qrels = QrelsReaderFactory.create(qrels_config).read()
         self._validate_metrics(self.metrics)
+        self._qrels_qids = set(self.qrels.keys())
+        # judged documents per query for nDCG'
+        self._qrels_sets = {}
+        if "ndcg_prime" in self.metrics:
+            self._qrels_sets = {query_id: set(judgments) for query_id, judgments in self.qrels.items()}
+        self._evaluators = {}
 
     @staticmethod
     def _preprocess_metrics(metrics):
@@ -89,6 +96,13 @@ class Scorer:
         except ValueError as e:
             raise ConfigError(e)
 
+    def _get_evaluator(self, measures):
+        """Evaluators are cached because building one converts all the qrels"""
+        key = frozenset(measures)
+        if key not in self._evaluators:
+            self._evaluators[key] = pytrec_eval.RelevanceEvaluator(self.qrels, key)
+        return self._evaluators[key]
+
     @staticmethod
     def _filter_dict(d, filter):
         for i in filter:
@@ -111,11 +125,11 @@ class Scorer:
 
         with open(results_path, 'r') as fp:
             system_output = pytrec_eval.parse_run(fp)
-        remove_from_run = set(system_output.keys()) - set(self.qrels.keys())
+        remove_from_run = set(system_output.keys()) - self._qrels_qids
         if remove_from_run:
             LOGGER.warning(f'Omitting {len(remove_from_run)} topics in the run that are not in the qrels')
             self._filter_dict(system_output, remove_from_run)
-        missing_queries = set(self.qrels.keys()) - set(system_output.keys())
+        missing_queries = self._qrels_qids - set(system_output.keys())
         if missing_queries:
             LOGGER.warning(f"Missing queries: {', '.join(missing_queries)}")
             self._add_dict(system_output, missing_queries)
@@ -124,15 +138,16 @@ class Scorer:
         if "ndcg_prime" in measures:
             ndcg_prime_results = self._calc_ndcg_prime(system_output)
             measures.discard("ndcg_prime")
-        evaluator = pytrec_eval.RelevanceEvaluator(self.qrels, measures)
+        evaluator = self._get_evaluator(measures)
         scores = evaluator.evaluate(system_output)
         if ndcg_prime_results:
             for query in scores.keys():
                 scores[query].update(ndcg_prime_results[query])
         if scores:
-            mean_scores = {}
-            for key in sorted(self.metrics):
-                mean_scores[key] = sum(data[key] for data in scores.values()) / len(scores)
+            metrics = sorted(self.metrics)
+            matrix = np.fromiter((data[key] for data in scores.values() for key in metrics),
+                                 dtype=np.float64, count=len(scores) * len(metrics)).reshape(len(scores), len(metrics))
+            mean_scores = dict(zip(metrics, matrix.mean(axis=0)))
             scores_string = ", ".join(f"{m}: {s:.3f}" for m, s in mean_scores.items())
             LOGGER.info(f"Average scores over {len(scores.keys())} queries: {scores_string}")
             self._write_scores(scores, scores_path)
@@ -143,12 +158,12 @@ class Scorer:
         For every query, remove document ids that do not belong to the set of
         judged documents for that query, and run nDCG over the modified output.
         """
-        evaluator = pytrec_eval.RelevanceEvaluator(self.qrels, {'ndcg'})
-        modified_run = collections.defaultdict(dict)
-        for query_id in system_output:
-            for doc_id in system_output[query_id]:
-                if doc_id in self.qrels[query_id].keys():
-                    modified_run[query_id][doc_id] = system_output[query_id][doc_id]
+        evaluator = self._get_evaluator({'ndcg'})
+        modified_run = {}
+        for query_id, run in system_output.items():
+            judged_docs = run.keys() & self._qrels_sets.get(query_id, ())
+            if judged_docs:
+                modified_run[query_id] = {doc_id: run[doc_id] for doc_id in judged_docs}
         ndcg_prime_scores = evaluator.evaluate(modified_run)
         ndcg_scores = evaluator.evaluate(system_output)
         combined_scores = {}
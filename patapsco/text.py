@@ -396,7 +396,8 @@ class StopWordsRemover:
         filename = lang + ".txt"
         path = pathlib.Path(__file__).parent / 'resources' / 'stopwords' / source / filename
         with open(path, 'r') as fp:
-            self.stop_words = {word.strip() for word in fp if word[0] != '#'}
+            # stop words are lowercased once here so that tokens only need to be lowercased for the lookup
+            self.stop_words = frozenset(word.strip().lower() for word in fp if word[0] != '#')
 
     def identify(self, tokens, is_lower=False):
         """Identify words to remove
@@ -408,11 +409,10 @@ class StopWordsRemover:
         Returns
             indices of tokens to remove
         """
-        if is_lower:
-            tokens = [index for index, token in enumerate(tokens) if token in self.stop_words]
-        else:
-            tokens = [index for index, token in enumerate(tokens) if token.lower() in self.stop_words]
-        return tokens
+        stop_words = self.stop_words
+        if not is_lower:
+            tokens = map(str.lower, tokens)
+        return [index for index, token in enumerate(tokens) if token in stop_words]
 
     def remove(self, tokens, indices):
         """Remove stop words
@@ -424,6 +424,9 @@ class StopWordsRemover:
         Returns
             list of str
         """
+        if not indices:
+            return tokens
+        indices = set(indices)
         return [token for index, token in enumerate(tokens) if index not in indices]
 
 
@@ -1,8 +1,12 @@
-import csv
+import codecs
 import dataclasses
+import functools
+import itertools
 import json
 import logging
 import pathlib
+import re
+import shutil
 from typing import Optional
 
 import luqum.parser
@@ -13,16 +17,19 @@ from .error import ConfigError, ParseError
 from .pipeline import Task
 from .schema import TextProcessorConfig, TopicsInputConfig
 from .text import TextProcessor
-from .util import DataclassJSONEncoder, InputIterator, LangStandardizer, NoGlobSupport, ReaderFactory
+from .util import InputIterator, LangStandardizer, NoGlobSupport, ReaderFactory, json_dumps, json_loads
 from .util.file import count_lines, count_lines_with, path_append
 from .util.formats import parse_xml_topics, parse_sgml_topics, parse_psq_table
 from .util.java import Java
 
 LOGGER = logging.getLogger(__name__)
 
+NON_DIGITS = re.compile(r'\D+')
+
 
 @dataclasses.dataclass
 class Topic:
+    __slots__ = ('id', 'lang', 'title', 'desc', 'report')
     id: str
     lang: str
     title: str
@@ -32,6 +39,7 @@ class Topic:
 
 @dataclasses.dataclass
 class Query:
+    __slots__ = ('id', 'lang', 'query', 'text', 'report')
     id: str
     lang: str
     query: str  # string that may include query syntax for the retrieval engine
@@ -55,6 +63,8 @@ class TopicReaderFactory(ReaderFactory):
 class TopicProcessor(Task):
     """Topic Preprocessing"""
 
+    thread_safe = True
+
     FIELD_MAP = {
         'title': 'title',
         'name': 'title',
@@ -70,6 +80,7 @@ class TopicProcessor(Task):
         """
         super().__init__(run_path)
         self.fields = self._extract_fields(config.fields)
+        self.join_fields = self._compile_join(self.fields)
 
     def process(self, topic):
         """
@@ -79,11 +90,20 @@ class TopicProcessor(Task):
         Returns
             Query
         """
-        text = ' '.join([getattr(topic, f).strip() for f in self.fields])
+        text = self.join_fields(topic)
         if not text:
             LOGGER.warning(f"Query from topic {topic.id} has no text.")
         return Query(topic.id, topic.lang, text, text, topic.report)
 
+    @staticmethod
+    def _compile_join(fields):
+        """Create a function that joins the stripped fields of a topic with spaces
+
+        The fields have been validated against FIELD_MAP so it is safe to generate the code.
+        """
+        source = 'lambda topic: f"' + ' '.join(f'{{topic.{field}.strip()}}' for field in fields) + '"'
+        return eval(source)
+
     @classmethod
     def _extract_fields(cls, fields_str):
         fields = fields_str.split('+')
@@ -108,7 +128,7 @@ class SgmlTopicReader(InputIterator):
 
     def __next__(self):
         topic = next(self.topics)
-        identifier = ''.join(filter(str.isdigit, topic[0])) if self.strip_non_digits else topic[0]
+        identifier = NON_DIGITS.sub('', topic[0]) if self.strip_non_digits else topic[0]
         return Topic(identifier, self.lang, topic[1], topic[2], None)
 
     def __len__(self):
@@ -130,7 +150,7 @@ class XmlTopicReader(InputIterator):
 
     def __next__(self):
         topic = next(self.topics)
-        identifier = ''.join(filter(str.isdigit, topic[0])) if self.strip_non_digits else topic[0]
+        identifier = NON_DIGITS.sub('', topic[0]) if self.strip_non_digits else topic[0]
         return Topic(identifier, topic[1], topic[2], topic[3], None)
 
     def __len__(self):
@@ -161,7 +181,13 @@ class Hc4JsonTopicReader(InputIterator):
         self.source = source
         self.qrels_lang = qrels_lang
         self.num_skipped = 0
-        self.topics = iter(self._parse(path, encoding))
+        self.parser = self._parse(path, encoding)
+        # read ahead to the first topic so that a file without usable topics is caught at configuration time
+        try:
+            first_topic = next(self.parser)
+        except StopIteration:
+            raise ConfigError(f"No topics available for {self.lang} {self.source}")
+        self.topics = itertools.chain([first_topic], self.parser)
 
     def __iter__(self):
         return self
@@ -169,6 +195,10 @@ class Hc4JsonTopicReader(InputIterator):
     def __next__(self):
         return next(self.topics)
 
+    def close(self):
+        # closing the generator closes its file
+        self.parser.close()
+
     def __len__(self):
         return count_lines(self.path, self.encoding)
 
@@ -198,18 +228,25 @@ class Hc4JsonTopicReader(InputIterator):
             raise SkipEntry()
 
     def _parse(self, path, encoding='utf8'):
-        with open(path, 'r', encoding=encoding) as fp:
-            try:
-                topics = [self._construct(json.loads(data)) for data in fp]
+        # the json parser decodes utf8 bytes directly so only decode other encodings
+        if codecs.lookup(encoding).name == 'utf-8':
+            mode, encoding = 'rb', None
+        else:
+            mode = 'r'
+        with open(path, mode, encoding=encoding) as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+                try:
+                    data = json_loads(line)
+                except json.JSONDecodeError as e:
+                    raise ParseError(f"Problem parsing json from {path}: {e}")
                 # filter topics that are not supported for this language or have errors
-                topics = [topic for topic in topics if topic is not None]
-                if self.num_skipped:
-                    LOGGER.info(f"Skipping {self.num_skipped} topics that don't support {self.lang} {self.source}")
-                if not topics:
-                    raise ConfigError(f"No topics available for {self.lang} {self.source}")
-                return topics
-            except json.decoder.JSONDecodeError as e:
-                raise ParseError(f"Problem parsing json from {path}: {e}")
+                topic = self._construct(data)
+                if topic is not None:
+                    yield topic
+        if self.num_skipped:
+            LOGGER.info(f"Skipping {self.num_skipped} topics that don't support {self.lang} {self.source}")
 
 
 class TsvTopicReader(InputIterator):
@@ -233,10 +270,16 @@ class TsvTopicReader(InputIterator):
 
     @staticmethod
     def parse(path, encoding='utf8'):
+        # msmarco style queries are not quoted so a plain split is enough
         with open(path, 'r', encoding=encoding) as fp:
-            reader = csv.reader(fp, delimiter='\t')
-            for line in reader:
-                yield line[0], line[1].strip()
+            for line in fp:
+                if not line.strip():
+                    continue
+                fields = line.rstrip('\n').split('\t', 2)
+                if len(fields) < 2:
+                    raise ParseError(f"Missing tab in topic line from {path}: {line}")
+                # like csv.reader, only the second column is used for the text
+                yield fields[0], fields[1].strip()
 
 
 class IRDSTopicReader(InputIterator, NoGlobSupport):
@@ -275,6 +318,8 @@ class IRDSTopicReader(InputIterator, NoGlobSupport):
 class QueryWriter(Task):
     """Write queries to a jsonl file using internal format"""
 
+    BUFFER_SIZE = 1 << 20
+
     def __init__(self, run_path, config, artifact_config):
         """
         Args:
@@ -284,7 +329,7 @@ class QueryWriter(Task):
         """
         super().__init__(run_path, artifact_config, base=config.output)
         path = self.base / 'queries.jsonl'
-        self.file = open(path, 'w')
+        self.file = open(path, 'wb', buffering=self.BUFFER_SIZE)
 
     def process(self, query):
         """
@@ -294,9 +339,21 @@ class QueryWriter(Task):
         Returns
             Query
         """
-        self.file.write(json.dumps(query, cls=DataclassJSONEncoder) + "\n")
+        self.file.write(json_dumps(query) + b"\n")
         return query
 
+    def batch_process(self, queries):
+        """
+        Args:
+            queries (list): List of Query objects
+
+        Returns
+            list of Query objects
+        """
+        if queries:
+            self.file.write(b"\n".join([json_dumps(query) for query in queries]) + b"\n")
+        return queries
+
     def end(self):
         super().end()
         self.file.close()
@@ -304,9 +361,8 @@ class QueryWriter(Task):
     def reduce(self, dirs):
         for base in dirs:
             path = path_append(base, 'queries.jsonl')
-            with open(path) as fp:
-                for line in fp:
-                    self.file.write(line)
+            with open(path, 'rb') as fp:
+                shutil.copyfileobj(fp, self.file)
 
 
 class QueryReader(InputIterator):
@@ -316,23 +372,36 @@ class QueryReader(InputIterator):
         self.path = pathlib.Path(path)
         if self.path.is_dir():
             self.path = self.path / 'queries.jsonl'
-        with open(self.path) as fp:
-            self.data = fp.readlines()
+        # the file is opened on first use so that readers only used for len() or peek() do not hold it open
+        self.file = None
+        self.closed = False
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        try:
-            return Query(**json.loads(self.data.pop(0)))
-        except IndexError:
-            raise StopIteration()
+        if self.closed:
+            raise StopIteration
+        if self.file is None:
+            self.file = open(self.path, 'rb')
+        line = self.file.readline()
+        if not line:
+            self.close()
+            raise StopIteration
+        return Query(**json_loads(line))
+
+    def close(self):
+        self.closed = True
+        if self.file:
+            self.file.close()
+            self.file = None
 
     def __len__(self):
         return count_lines(self.path)
 
     def peek(self):
-        return Query(**json.loads(self.data[0]))
+        with open(self.path, 'rb') as fp:
+            return Query(**json_loads(fp.readline()))
 
 
 class QueryGenerator:
@@ -500,6 +569,8 @@ class PSQGenerator(QueryGenerator):
 class QueryProcessor(TextProcessor):
     """Query Preprocessing"""
 
+    CACHE_SIZE = 100000  # topic sets and query logs often repeat the same query text
+
     def __init__(self, run_path, config, lang):
         """
         Args:
@@ -515,6 +586,7 @@ class QueryProcessor(TextProcessor):
         if self.psq_config and self.parse:
             raise ConfigError("Cannot use both PSQ and Lucene boolean query parsing")
         self.generator = None
+        self.cached_process_text = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._process_text)
 
     def begin(self):
         super().begin()
@@ -542,7 +614,16 @@ class QueryProcessor(TextProcessor):
         Returns
             Query
         """
-        text = query.text
-        text = self.pre_normalize(text)
+        query_syntax, text = self.cached_process_text(query.text)
+        return Query(query.id, query.lang, query_syntax, text, query.report)
+
+    def _process_text(self, raw_text):
+        """Normalize, tokenize and generate the query syntax for a query's text
+
+        Returns:
+            tuple of query syntax and normalized text
+        """
+        text = self.pre_normalize(raw_text)
         tokens = self.tokenize(text)
-        return self.generator.generate(query, text, tokens)
+        query = self.generator.generate(Query(None, None, raw_text, raw_text, None), text, tokens)
+        return query.query, query.text
@@ -12,6 +12,11 @@ import timeit
 import more_itertools
 import pycountry
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..error import BadDataError, ConfigError
 from .file import validate_encoding
 
@@ -111,6 +116,30 @@ class DataclassJSONEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
+# json.dumps() creates a new encoder on every call when given a cls so share one
+DATACLASS_ENCODER = DataclassJSONEncoder()
+
+
+def json_dumps(obj):
+    """Serialize an object that may contain dataclasses to utf8 encoded json bytes
+
+    Uses orjson if it is installed.
+    """
+    if orjson:
+        return orjson.dumps(obj)
+    return DATACLASS_ENCODER.encode(obj).encode('utf8')
+
+
+def json_loads(data):
+    """Deserialize json from str or bytes
+
+    Uses orjson if it is installed. Both implementations raise json.JSONDecodeError on bad input.
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class Timer:
     def __init__(self, name=None):
         self.name = name
@@ -123,9 +152,20 @@ class Timer:
         self.time += timeit.default_timer() - self.start
 
 
+def close_iterator(iterator):
+    """Close an iterator that holds resources like an open file"""
+    close = getattr(iterator, 'close', None)
+    if close:
+        close()
+
+
 class InputIterator(abc.ABC, collections.abc.Iterator, collections.abc.Sized):
     """Iterable that also supports len()"""
 
+    def close(self):
+        """Optional close method for releasing open files"""
+        pass
+
     def __str__(self):
         return self.__class__.__name__
 
@@ -149,6 +189,9 @@ class TimedIterator(collections.abc.Iterator):
     def __len__(self):
         return len(self.iterator)
 
+    def close(self):
+        close_iterator(self.iterator)
+
 
 class ChunkedIterator(InputIterator):
     """Iterate over iterable in chunks of size n"""
@@ -180,6 +223,9 @@ class ChunkedIterator(InputIterator):
     def __len__(self):
         return len(self.iterable)
 
+    def close(self):
+        close_iterator(self.iterable)
+
 
 class SlicedIterator(InputIterator):
     """Support start and stop offsets on InputIterator"""
@@ -200,7 +246,12 @@ class SlicedIterator(InputIterator):
             self.iterator = itertools.islice(iterator, start, stop)
 
     def __next__(self):
-        return next(self.iterator)
+        try:
+            return next(self.iterator)
+        except StopIteration:
+            # release the input when stopping before the end like a parallel sub-job
+            self.close()
+            raise
 
     def __len__(self):
         original_length = len(self.original_iterator)
@@ -210,6 +261,9 @@ class SlicedIterator(InputIterator):
         else:
             return min(original_length, self.stop) - start
 
+    def close(self):
+        close_iterator(self.original_iterator)
+
     def __str__(self):
         return str(self.original_iterator)
 
@@ -276,6 +330,9 @@ class GlobIterator(InputIterator):
                 count += len(reader)
         return count
 
+    def close(self):
+        close_iterator(self.gen)
+
     def __str__(self):
         return str(self.cls.__name__)
 
@@ -1,4 +1,6 @@
+import functools
 import gzip
+import os
 import pathlib
 import shutil
 
@@ -57,6 +59,31 @@ def is_complete(path):
     return file.exists()
 
 
+def cache_until_modified(path_index=0):
+    """Decorator that caches the result of a function over a file until the file changes
+
+    The cache key includes the arguments and the modification time and size of the file.
+
+    Args:
+        path_index (int): Position of the path in the arguments.
+    """
+    def decorator(func):
+        cache = {}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stat = os.stat(args[path_index])
+            key = (tuple(str(arg) for arg in args), tuple(sorted(kwargs.items())), stat.st_mtime_ns, stat.st_size)
+            if key not in cache:
+                cache[key] = func(*args, **kwargs)
+            return cache[key]
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+@cache_until_modified()
 def count_lines(path, encoding='utf8'):
     """Count lines in a text file"""
     if isinstance(path, pathlib.Path):
@@ -78,6 +105,7 @@ def gzip_count_lines(path):
     return count
 
 
+@cache_until_modified(path_index=1)
 def count_lines_with(string, path, encoding='utf8'):
     """Count lines in a text file with a particular string"""
     if path.endswith('.gz'):
@@ -4,6 +4,7 @@ import functools
 import gzip
 import itertools
 import json
+import operator
 import xml.etree.ElementTree as ElementTree
 
 import bs4
@@ -113,20 +114,17 @@ def parse_qrels(path):
 def normalize_psq_entry(entry, cum_thresh=0.97, elem_thresh=1e-5):
     """Throw out small probabilities and normalize so sum = 1"""
     total = sum(entry.values())
-    entry = {word: prob / total for word, prob in entry.items()}
-    entry = {word: prob for word, prob in entry.items() if prob > elem_thresh}
-    entry = dict(sorted(entry.items(), key=lambda item: item[1], reverse=True))
+    # work on a list of (word, prob) sorted by prob rather than rebuilding dictionaries at each step
+    items = [(word, prob / total) for word, prob in entry.items() if prob / total > elem_thresh]
+    items.sort(key=operator.itemgetter(1), reverse=True)
     if cum_thresh < 1:
-        probs = np.array(list(entry.values()), dtype='float')
-        cum_index = np.where(np.cumsum(probs) > cum_thresh)
-        if cum_index[0].size == 0:
-            index = len(entry) - 1
-        else:
-            index = np.where(np.cumsum(probs) > cum_thresh)[0][0]
-        entry = dict(itertools.islice(entry.items(), int(index) + 1))
-        total = sum(entry.values())
-        entry = {word: prob / total for word, prob in entry.items()}
-    return entry
+        cum_probs = np.cumsum(np.fromiter((prob for _, prob in items), dtype='float', count=len(items)))
+        cum_index = np.flatnonzero(cum_probs > cum_thresh)
+        index = cum_index[0] if cum_index.size else len(items) - 1
+        items = items[:int(index) + 1]
+        total = sum(prob for _, prob in items)
+        return {word: prob / total for word, prob in items}
+    return dict(items)
 
 
 def parse_psq_table(path, threshold=0.97):
@@ -138,6 +136,6 @@ def parse_psq_table(path, threshold=0.97):
         trans_table = json.load(fp)
         # lucene limits clauses to 1024 terms
         for k, v in trans_table.items():
-            while len(v) > 1024:
-                v.pop(list(v.keys())[-1])  # remove last item in dictionary
+            if len(v) > 1024:
+                trans_table[k] = dict(itertools.islice(v.items(), 1024))  # keep the first 1024 items in the file
         return {k: norm(v) for k, v in trans_table.items()}
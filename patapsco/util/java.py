@@ -53,3 +53,14 @@ class Java:
         self.PSQIndexSearcher = jnius.autoclass('edu.jhu.hlt.psq.search.PSQIndexSearcher')
         self.BagOfWordsQueryGenerator = jnius.autoclass('io.anserini.search.query.BagOfWordsQueryGenerator')
         self.QueryParser = jnius.autoclass('org.apache.lucene.queryparser.classic.QueryParser')
+
+
+def detach_thread():
+    """Detach the current thread from the JVM
+
+    pyjnius attaches threads to the JVM when they first call into Java and they must detach before exiting.
+    This does nothing if the JVM has not been started.
+    """
+    if jnius_config.vm_running:
+        import jnius
+        jnius.detach()
@@ -234,6 +234,9 @@ class Normalizer:
 
     @staticmethod
     def remove_control_chars(text):
+        # most text has no control chars so check that in C before filtering char by char
+        if text.replace("\n", " ").isprintable():
+            return text
         return ''.join(char for char in text if char.isprintable() or char == "\n")
 
     @staticmethod
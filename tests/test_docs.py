@@ -1,8 +1,11 @@
 import pathlib
+import tempfile
 
 import pytest
 
 from patapsco.docs import *
+from patapsco.schema import DocumentsConfig, DocumentsInputConfig, TextProcessorConfig
+from patapsco.util.file import delete_dir
 
 
 def test_parse_json_documents():
@@ -52,3 +55,38 @@ def test_parse_msmarco_documents():
     with pytest.raises(StopIteration):
         next(doc_iter)
     assert doc_iter.fp.closed
+
+
+def test_doc_writer_batch_process():
+    class Mock:
+        output = 'docs'
+
+    temp_dir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        writer = DocWriter(str(temp_dir), Mock(), None)
+        doc = Doc('1', 'eng', 'text 1', None)
+        doc.original_text = 'Text 1'
+        docs = [doc, Doc('2', 'eng', 'tëxt 2', None)]
+        assert writer.batch_process(docs) == docs
+        writer.file.close()
+        docs = list(DocReader(str(temp_dir / 'docs')))
+        assert docs == [Doc('1', 'eng', 'text 1', None), Doc('2', 'eng', 'tëxt 2', None)]
+        assert not hasattr(docs[0], 'original_text')
+    finally:
+        delete_dir(temp_dir)
+
+
+def test_document_processor_batch_process():
+    text_config = TextProcessorConfig(tokenize="whitespace", stopwords=False, stem=False)
+    input_config = DocumentsInputConfig(format='jsonl', lang='eng', path='docs.jsonl')
+    processor = DocumentProcessor('', DocumentsConfig(input=input_config, process=text_config), 'eng')
+    processor.begin()
+    processor.MAX_TEXT_LEN = 20
+    docs = [Doc('1', 'eng', 'The  First\u0000Doc', None),
+            Doc('2', 'eng', 'This document is too long', None),
+            Doc('3', 'eng', 'ŞECOND Doc', None)]
+    docs = processor.batch_process(docs)
+    assert docs[0].text == 'the firstdoc'
+    assert docs[0].original_text == 'The FirstDoc'
+    assert docs[1] is None
+    assert docs[2].text == processor.process(Doc('3', 'eng', 'ŞECOND Doc', None)).text == 'şecond doc'
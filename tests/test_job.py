@@ -1,3 +1,4 @@
+import os
 import pathlib
 import tempfile
 
@@ -244,6 +245,41 @@ class TestJobBuilder:
         with pytest.raises(ConfigError, match="Unrecognized pipeline mode"):
             builder._build_stage1_pipeline(iterator, tasks)
 
+    def test_build_stage1_with_parallel_pipeline_mode(self):
+        conf = self.create_config('test')
+        conf.run.stage1.mode = "parallel"
+        builder = JobBuilder(conf)
+        plan = [Tasks.DOCUMENTS, Tasks.INDEX]
+        iterator = builder._get_stage1_iterator(plan)
+        tasks = builder._get_stage1_tasks(plan)
+        with pytest.raises(ConfigError, match="only supported for stage 2"):
+            builder._build_stage1_pipeline(iterator, tasks)
+
+    def test_build_stage2_defaults_to_batch_with_retrieval(self):
+        conf = self.create_config('test')
+        builder = JobBuilder(conf)
+        retrieve_conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path="index")))
+        tasks = [PyseriniRetriever(self.temp_dir, retrieve_conf)]
+        pipeline = builder._build_stage2_pipeline(iter([]), tasks)
+        assert isinstance(pipeline, BatchPipeline)
+        assert pipeline.iterator.iterator.n == JobBuilder.DEFAULT_RETRIEVAL_BATCH_SIZE
+
+    def test_build_stage2_with_retrieval_keeps_configured_mode(self):
+        conf = self.create_config('test')
+        conf.run.stage2.mode = "streaming"
+        builder = JobBuilder(conf)
+        retrieve_conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path="index")))
+        tasks = [PyseriniRetriever(self.temp_dir, retrieve_conf)]
+        pipeline = builder._build_stage2_pipeline(iter([]), tasks)
+        assert isinstance(pipeline, StreamingPipeline)
+
+    def test_build_stage2_without_retrieval_is_streaming(self):
+        conf = self.create_config('test')
+        builder = JobBuilder(conf)
+        tasks = builder._get_stage2_tasks([Tasks.TOPICS])
+        pipeline = builder._build_stage2_pipeline(iter([]), tasks)
+        assert isinstance(pipeline, StreamingPipeline)
+
     def test_build_stage2_with_standard_topics(self):
         conf = self.create_config('test')
         builder = JobBuilder(conf)
@@ -390,3 +426,13 @@ class TestJobBuilder:
         builder = JobBuilder(conf)
         with pytest.raises(ConfigError):
             builder.check_text_processing()
+
+
+def test_multiprocessing_job_splits_retrieval_threads():
+    conf = RunnerConfig(run={'name': 'test'},
+                        retrieve=RetrieveConfig(name='bm25', input=RetrieveInputConfig(index=PathConfig(path='index'))))
+    MultiprocessingJob._update_stage2_threads(conf, os.cpu_count() + 1)
+    assert conf.retrieve.threads == 1
+    conf.retrieve.threads = 3
+    MultiprocessingJob._update_stage2_threads(conf, 2)
+    assert conf.retrieve.threads == 3
@@ -1,3 +1,7 @@
+import time
+
+import pytest
+
 from patapsco.pipeline import *
 
 
@@ -24,6 +28,15 @@ class CollectorTask(Task):
         return item
 
 
+class SleepTask(Task):
+    thread_safe = True
+
+    def process(self, item):
+        # later items finish first so the threads complete out of order
+        time.sleep(0.001 * (21 - item))
+        return item
+
+
 class RejectorTask(Task):
     def process(self, item):
         if item == 2:
@@ -31,6 +44,13 @@ class RejectorTask(Task):
         return item
 
 
+class ErrorTask(Task):
+    def process(self, item):
+        if item == 2:
+            raise ValueError("bad item")
+        return item
+
+
 class NumberGenerator:
     def __init__(self):
         self.docs = iter(range(5))
@@ -67,6 +87,29 @@ def test_streaming_pipeline_reject_item():
     assert collector.items == [2, 6, 8, 10]
 
 
+def test_streaming_pipeline_not_timed():
+    collector = CollectorTask()
+    pipeline = StreamingPipeline(NumberGenerator(), [AddTask(), MultiplyTask(), collector], timed=False)
+    pipeline.run()
+    assert pipeline.count == 5
+    assert collector.items == [2, 4, 6, 8, 10]
+    assert pipeline.tasks[2] is collector
+    assert pipeline.report == []
+
+
+def test_pipeline_closes_iterator():
+    class ClosingGenerator(NumberGenerator):
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    iterator = ClosingGenerator()
+    pipeline = BatchPipeline(iterator, [AddTask()], 2)
+    pipeline.run()
+    assert iterator.closed
+
+
 def test_batch_pipeline():
     collector = CollectorTask()
     pipeline = BatchPipeline(NumberGenerator(), [AddTask(), MultiplyTask(), collector], 2)
@@ -83,3 +126,83 @@ def test_batch_pipeline_reject_item():
     pipeline.run()
     assert pipeline.count == 4
     assert collector.items == [3, 9, 12, 15]
+
+
+def test_batch_pipeline_timing():
+    pipeline = BatchPipeline(NumberGenerator(), [SleepTask()], 2)
+    pipeline.run()
+    assert pipeline.report[1][0] == 'SleepTask'
+    assert pipeline.report[1][1] > 0
+
+
+def test_parallel_streaming_pipeline():
+    collector = CollectorTask()
+    pipeline = ParallelStreamingPipeline(NumberGenerator(), [AddTask(), MultiplyTask(), collector], 3)
+    pipeline.run()
+    assert pipeline.count == 5
+    # the tasks see the items in the order that the threads reach them
+    assert sorted(collector.items) == [2, 4, 6, 8, 10]
+
+
+def test_parallel_streaming_pipeline_reject_item():
+    collector = CollectorTask()
+    pipeline = ParallelStreamingPipeline(NumberGenerator(), [AddTask(), RejectorTask(), MultiplyTask(), collector], 3)
+    pipeline.run()
+    assert pipeline.count == 4
+    assert sorted(collector.items) == [2, 6, 8, 10]
+
+
+def test_parallel_streaming_pipeline_preserves_order():
+    collector = CollectorTask()
+    pipeline = ParallelStreamingPipeline(iter(range(1, 21)), [SleepTask(), collector], 4)
+    pipeline.run()
+    assert pipeline.count == 20
+    assert collector.items == list(range(1, 21))
+
+
+def test_parallel_streaming_pipeline_only_runs_first_thread_safe_group_in_pool():
+    pipeline = ParallelStreamingPipeline(NumberGenerator(), [SleepTask(), AddTask(), SleepTask()], 2)
+    assert [str(task) for task in pipeline.pre_tasks] == []
+    assert [str(task) for task in pipeline.parallel_tasks] == ['SleepTask']
+    assert [str(task) for task in pipeline.post_tasks] == ['AddTask', 'SleepTask']
+
+
+def test_parallel_streaming_pipeline_with_task_before_thread_safe_task():
+    collector = CollectorTask()
+    pipeline = ParallelStreamingPipeline(iter(range(20)), [AddTask(), RejectorTask(), SleepTask(), collector], 4)
+    assert [str(task) for task in pipeline.pre_tasks] == ['AddTask', 'RejectorTask']
+    assert [str(task) for task in pipeline.parallel_tasks] == ['SleepTask']
+    assert [str(task) for task in pipeline.post_tasks] == ['CollectorTask']
+    pipeline.run()
+    assert pipeline.count == 19
+    assert collector.items == [1] + list(range(3, 21))
+
+
+def test_parallel_streaming_pipeline_error():
+    pipeline = ParallelStreamingPipeline(NumberGenerator(), [AddTask(), ErrorTask()], 2)
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+
+def test_threaded_pipeline():
+    collector = CollectorTask()
+    pipeline = ThreadedPipeline(NumberGenerator(), [AddTask(), MultiplyTask(), collector])
+    pipeline.run()
+    assert pipeline.count == 5
+    assert collector.items == [2, 4, 6, 8, 10]
+
+
+def test_threaded_pipeline_reject_item():
+    collector = CollectorTask()
+    pipeline = ThreadedPipeline(NumberGenerator(), [AddTask(), RejectorTask(), MultiplyTask(), collector])
+    pipeline.run()
+    assert pipeline.count == 4
+    assert collector.items == [2, 6, 8, 10]
+
+
+def test_threaded_pipeline_error():
+    collector = CollectorTask()
+    pipeline = ThreadedPipeline(NumberGenerator(), [AddTask(), ErrorTask(), collector])
+    with pytest.raises(ValueError):
+        pipeline.run()
+    assert collector.items == [1]
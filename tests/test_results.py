@@ -1,8 +1,10 @@
 import pathlib
+import tempfile
 
 import pytest
 
 from patapsco.results import *
+from patapsco.util.file import delete_dir
 
 
 def test_json_results_reader():
@@ -45,3 +47,21 @@ def test_trec_results_reader():
     assert results.results[0].rank == 1
     with pytest.raises(StopIteration):
         next(results_iter)
+
+
+def test_trec_results_writer():
+    class Mock:
+        class run:
+            path = tempfile.mkdtemp()
+            results = 'results.txt'
+
+    try:
+        writer = TrecResultsWriter(Mock())
+        writer.begin()
+        writer.process(Results(Query('1', 'eng', 'q', 'q', None), 'eng', 'test', [Result('aaa', 0, 2.5), Result('bbb', 1, 1.5)]))
+        writer.process(Results(Query('2', 'eng', 'q', 'q', None), 'eng', 'test', []))
+        writer.file.close()
+        lines = (pathlib.Path(Mock.run.path) / 'results.txt').read_text().splitlines()
+        assert lines == ['1 Q0 aaa 0 2.5 test', '1 Q0 bbb 1 1.5 test']
+    finally:
+        delete_dir(Mock.run.path)
@@ -25,6 +25,12 @@ class TestPyseriniRetriever:
         pr.begin()
         assert pr.lang == "rus"
 
+    def test_thread_safe(self):
+        conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path=str(self.temp_dir))))
+        assert PyseriniRetriever(run_path=self.temp_dir, config=conf).thread_safe
+        conf.psq = True
+        assert not PyseriniRetriever(run_path=self.temp_dir, config=conf).thread_safe
+
     def test_no_lang(self):
         conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path=str(self.temp_dir))))
         pr = PyseriniRetriever(run_path=self.temp_dir, config=conf)
@@ -86,6 +92,43 @@ class TestPyseriniRetriever:
             pr.begin()
             a = pr.searcher
 
+    def test_batch_process_matches_process(self):
+        self.create_small_index()
+        lang_path = self.temp_dir / 'index' / ".lang"
+        lang_path.write_text("eng")
+        conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path='index')))
+        pr = PyseriniRetriever(run_path=self.temp_dir, config=conf)
+        pr.begin()
+        queries = [Query("1", "eng", "test", "test", None), Query("2", "eng", "nothing", "nothing", None)]
+        batch = pr.batch_process(queries)
+        single = [pr.process(query) for query in queries]
+        pr.end()
+        assert [results.query.id for results in batch] == ["1", "2"]
+        assert [results.results for results in batch] == [results.results for results in single]
+        assert batch[0].results[0].doc_id == "1234"
+        assert batch[1].results == []
+
+    def _create_fallback_retriever(self, **kwargs):
+        class NoBatchSearcher:
+            def batch_search(self, *args, **kwargs):
+                raise AssertionError("batch search should not be used")
+
+        conf = RetrieveConfig(name="bm25", input=RetrieveInputConfig(index=PathConfig(path='index')), **kwargs)
+        pr = PyseriniRetriever(run_path=self.temp_dir, config=conf)
+        pr._searcher = NoBatchSearcher()
+        pr.process = lambda query: query.id
+        return pr
+
+    def test_batch_process_with_psq_searches_one_at_a_time(self):
+        pr = self._create_fallback_retriever(psq=True)
+        queries = [Query("1", "eng", "test", "test", None), Query("2", "eng", "test", "test", None)]
+        assert pr.batch_process(queries) == ["1", "2"]
+
+    def test_batch_process_with_duplicate_ids_searches_one_at_a_time(self):
+        pr = self._create_fallback_retriever()
+        queries = [Query("1", "eng", "test", "test", None), Query("1", "eng", "other", "other", None)]
+        assert pr.batch_process(queries) == ["1", "1"]
+
     def create_small_index(self):
         run_directory = self.temp_dir
         output_directory = 'index'
@@ -5,6 +5,7 @@ import pytest
 
 from patapsco.topics import *
 
+from patapsco.util import SlicedIterator
 from patapsco.util.file import delete_dir
 from patapsco.schema import PSQConfig, TextProcessorConfig, QueriesConfig
 from patapsco.text import TextProcessor
@@ -15,6 +16,7 @@ def test_topic_process():
     class Mock:
         def __init__(self, fields):
             self.fields = fields
+            self.join_fields = TopicProcessor._compile_join(fields)
 
     mock = Mock(['title', 'desc'])
     topic = Topic('1', 'eng', 'title', 'desc', 'report')
@@ -48,6 +50,31 @@ def test_parse_msmarco_topics():
         next(topic_iter)
 
 
+def test_parse_tsv_topics_with_quotes_extra_column_and_blank_line():
+    temp_dir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        path = temp_dir / 'queries.tsv'
+        path.write_text('1\t"quoted" test\t with tab \n\n2\tdefine test\n', encoding='utf8')
+        topics = list(TsvTopicReader.parse(str(path)))
+        assert topics == [('1', '"quoted" test'), ('2', 'define test')]
+    finally:
+        delete_dir(temp_dir)
+
+
+def test_sgml_topic_reader_strip_non_digits():
+    path = pathlib.Path(__file__).parent / 'trec_files' / 'topics.txt'
+    topics = SgmlTopicReader(str(path), 'utf8', 'eng', False, True)
+    assert next(topics).id == '141'
+    topics = SgmlTopicReader(str(path), 'utf8', 'eng', False, False)
+    assert next(topics).id == 'C141'
+
+
+def test_xml_topic_reader_strip_non_digits():
+    path = pathlib.Path(__file__).parent / 'trec_files' / 'topics.xml'
+    topics = XmlTopicReader(str(path), 'utf8', 'eng', True)
+    assert [topic.id for topic in topics] == ['1', '2']
+
+
 class TestHc4JsonTopicReader:
     def test_parse_json_topics(self):
         directory = pathlib.Path(__file__).parent / 'json_files'
@@ -66,6 +93,15 @@ class TestHc4JsonTopicReader:
         with pytest.raises(StopIteration):
             next(topic_iter)
 
+    def test_close(self):
+        directory = pathlib.Path(__file__).parent / 'json_files'
+        path = directory / 'topics.jsonl'
+        topic_iter = Hc4JsonTopicReader(str(path.absolute()), 'utf8', 'eng', 'original')
+        assert next(topic_iter).id == '001'
+        topic_iter.close()
+        with pytest.raises(StopIteration):
+            next(topic_iter)
+
     def test_with_bad_language(self):
         directory = pathlib.Path(__file__).parent / 'json_files'
         path = directory / 'topics.jsonl'
@@ -141,6 +177,59 @@ def test_query_reader():
     with pytest.raises(StopIteration):
         next(query_iter)
 
+
+def test_query_reader_opens_file_on_first_use():
+    directory = pathlib.Path(__file__).parent / 'json_files'
+    query_iter = QueryReader(str(directory))
+    assert len(query_iter) == 2
+    assert query_iter.peek().id == '001'
+    assert query_iter.file is None
+    assert next(query_iter).id == '001'
+    assert query_iter.file is not None
+    query_iter.close()
+    assert query_iter.file is None
+    with pytest.raises(StopIteration):
+        next(query_iter)
+
+
+def test_query_reader_closed_by_sliced_iterator():
+    directory = pathlib.Path(__file__).parent / 'json_files'
+    query_iter = QueryReader(str(directory))
+    sliced_iter = SlicedIterator(query_iter, 0, 1)
+    assert [query.id for query in sliced_iter] == ['001']
+    assert query_iter.closed
+
+
+def test_query_writer_batch_process():
+    class Mock:
+        output = 'queries'
+
+    temp_dir = pathlib.Path(tempfile.mkdtemp())
+    try:
+        writer = QueryWriter(str(temp_dir), Mock(), None)
+        queries = [Query('001', 'eng', 'test 1', 'test 1', None), Query('002', 'eng', 'tést 2', 'tést 2', None)]
+        assert writer.batch_process(queries) == queries
+        writer.batch_process([])
+        writer.process(Query('003', 'eng', 'test 3', 'test 3', None))
+        writer.file.close()
+        queries = list(QueryReader(str(temp_dir / 'queries')))
+        assert [query.id for query in queries] == ['001', '002', '003']
+        assert queries[1].text == 'tést 2'
+    finally:
+        delete_dir(temp_dir)
+
+
+def test_query_processor_with_repeated_text():
+    text_config = TextProcessorConfig(tokenize="whitespace", stopwords=False, stem=False)
+    processor = QueryProcessor('', QueriesConfig(process=text_config), 'eng')
+    processor.begin()
+    query1 = processor.process(Query('1', 'eng', 'Test  Query', 'Test  Query', 'report 1'))
+    query2 = processor.process(Query('2', 'eng', 'Test  Query', 'Test  Query', None))
+    assert query1 == Query('1', 'eng', 'test query', 'Test Query', 'report 1')
+    assert query2 == Query('2', 'eng', 'test query', 'Test Query', None)
+    assert processor.cached_process_text.cache_info().hits == 1
+
+
 class TestPSQ:
     def setup_method(self):
         self.temp_dir = pathlib.Path(tempfile.mkdtemp())
@@ -1,3 +1,5 @@
+import dataclasses
+import json
 import pathlib
 
 import pytest
@@ -204,6 +206,23 @@ def text_ignore_exception():
     assert True
 
 
+def test_json_dumps_and_loads_dataclass():
+    @dataclasses.dataclass
+    class Item:
+        id: str
+        text: str
+
+    data = json_dumps(Item('1', 'café'))
+    assert isinstance(data, bytes)
+    assert json_loads(data) == {'id': '1', 'text': 'café'}
+    assert json_loads(data.decode('utf8')) == {'id': '1', 'text': 'café'}
+
+
+def test_json_loads_bad_data():
+    with pytest.raises(json.JSONDecodeError):
+        json_loads('{"id": ')
+
+
 class TestComponentFactory:
     def test_register_with_string_class_name(self):
         with pytest.raises(ConfigError):
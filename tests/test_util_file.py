@@ -42,6 +42,16 @@ def test_count_lines():
     assert file.count_lines(str(directory / 'results.txt')) == 4
 
 
+def test_count_lines_is_updated_when_file_changes():
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'test.txt'
+        path.write_text('1\n2\n')
+        assert file.count_lines(path) == 2
+        assert file.count_lines(str(path)) == 2
+        path.write_text('1\n2\n3\n')
+        assert file.count_lines(path) == 3
+
+
 def test_count_lines_with():
     directory = pathlib.Path(__file__).parent / 'trec_files'
     assert file.count_lines_with('<topic', str(directory / 'topics.xml')) == 3
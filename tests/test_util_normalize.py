@@ -50,6 +50,8 @@ class TestNormalizer:
 
     def test_remove_control_chars(self):
         assert Normalizer.remove_control_chars("a\uFEFFb") == "ab"
+        assert Normalizer.remove_control_chars("a\u0007b\nc") == "ab\nc"
+        assert Normalizer.remove_control_chars("a b\nc") == "a b\nc"
 
     def test_fix_encoding(self):
         text = "But we\u00e2\u0080\u0099ve come out the other side of it"